@@ -189,8 +189,9 @@ class ClientCoordinatorBase(CoordinatorBase):
 
         self._coord_lock.acquire()
         try:
-            if host in self._cl_children:
-                device = self._cl_children[host].basedevice
+            child = self._cl_children.get(host)
+            if child is not None:
+                device = child.basedevice
         finally:
             self._coord_lock.release()
 
@@ -209,11 +210,11 @@ class ClientCoordinatorBase(CoordinatorBase):
 
         self._coord_lock.acquire()
         try:
-            if ip in self._cl_ip_to_host_lookup:
-                if ip in self._cl_ip_to_host_lookup:
-                    host = self._cl_ip_to_host_lookup[ip]
-                    if host in self._cl_children:
-                        device = self._cl_children[host].basedevice
+            host = self._cl_ip_to_host_lookup.get(ip)
+            if host is not None:
+                child = self._cl_children.get(host)
+                if child is not None:
+                    device = child.basedevice
         finally:
             self._coord_lock.release()
 
@@ -35,6 +35,11 @@ class CoordinatorBase:
         connectivity and interoperability with a class of devices.  A derived coordinator will scan the medium such as a network
         for the devices declared in the landscape description.  The coordinator will also create the threads necessary to maintain
         communicates with the external devices over the medium.
+
+        ..note: The :class:`LandscapeOperationalLayer` calls :meth:`activate` and :meth:`establish_connectivity`
+                on the coordinators of an activation stage concurrently, each on its own thread.  Derived
+                coordinators must guard their own state with the coordinator lock and must not modify
+                landscape state that is shared with other coordinators without holding the landscape lock.
     """
 
     def __init__(self, lscape: "Landscape", *args, coord_config=None, **kwargs):
@@ -67,7 +72,8 @@ class CoordinatorBase:
     def activate(self, activation_params: LandscapeActivationParams):
         """
             Called by the :class:`LandscapeOperationalLayer` in order for the coordinator to be able to
-            potentially enhanced devices.
+            potentially enhanced devices.  This can be called concurrently with the `activate` method of
+            other coordinators.
         """
         raise NotOverloadedError("activate: must be overloaded by derived coordinator classes")
 
@@ -89,7 +95,8 @@ class CoordinatorBase:
     def establish_connectivity(self, activation_params: LandscapeActivationParams):
         """
             Called by the :class:`LandscapeOperationalLayer` in order for the coordinator to be able to
-            verify connectivity with devices.
+            verify connectivity with devices.  This can be called concurrently with the `establish_connectivity`
+            method of other coordinators.
         """
         raise NotOverloadedError("activate: must be overloaded by derived coordinator classes")
 
@@ -102,7 +109,7 @@ class CoordinatorBase:
 
         self._coord_lock.acquire()
         try:
-            chlist = [c for c in self._cl_children.values()]
+            chlist = list(self._cl_children.values())
         finally:
             self._coord_lock.release()
 
@@ -168,8 +175,9 @@ class CoordinatorBase:
 
         self._coord_lock.acquire()
         try:
-            if key in self._cl_children:
-                found = self._cl_children[key].basedevice
+            child = self._cl_children.get(key)
+            if child is not None:
+                found = child.basedevice
         finally:
             self._coord_lock.release()
 
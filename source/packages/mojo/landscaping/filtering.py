@@ -0,0 +1,83 @@
+"""
+.. module:: filtering
+    :platform: Darwin, Linux, Unix, Windows
+    :synopsis: Module containing helper functions used to apply include and exclude filters
+               when selecting landscape objects and configurations.
+
+.. moduleauthor:: Myron Walker <myron.walker@gmail.com>
+
+"""
+
+__author__ = "Myron Walker"
+__copyright__ = "Copyright 2023, Myron W Walker"
+__credits__ = []
+
+
+
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import functools
+
+from mojo.interfaces.iexcludefilter import IExcludeFilter
+from mojo.interfaces.iincludefilter import IIncludeFilter
+
+
+def create_filter_selector(include_filters: Optional[List[IIncludeFilter]]=None,
+                           exclude_filters: Optional[List[IExcludeFilter]]=None) -> Callable[[Any], bool]:
+    """
+        Creates a selector function that returns `True` for objects that match at least one of the
+        include filters and none of the exclude filters.  A filter list of `None` does not restrict
+        the selection.
+
+        :param include_filters: The include filters an object must match one of to be selected.
+        :param exclude_filters: The exclude filters an object must not match any of to be selected.
+    """
+
+    if include_filters is None and exclude_filters is None:
+        def selector(check_object: Any) -> bool:
+            return True
+
+    elif exclude_filters is None:
+        def selector(check_object: Any) -> bool:
+            return any(ifilter.should_include(check_object) for ifilter in include_filters)
+
+    elif include_filters is None:
+        def selector(check_object: Any) -> bool:
+            return not any(xfilter.should_exclude(check_object) for xfilter in exclude_filters)
+
+    else:
+        def selector(check_object: Any) -> bool:
+            return any(ifilter.should_include(check_object) for ifilter in include_filters) and \
+                not any(xfilter.should_exclude(check_object) for xfilter in exclude_filters)
+
+    return selector
+
+
+def compile_filter_selector(include_filters: Optional[Sequence[IIncludeFilter]]=None,
+                            exclude_filters: Optional[Sequence[IExcludeFilter]]=None) -> Callable[[Any], bool]:
+    """
+        Gets a selector function for the include and exclude filters from a cache of compiled
+        selectors, so repeated selections with the same filters reuse the same selector.  Filters
+        that are not hashable get a newly created selector.
+
+        :param include_filters: The include filters an object must match one of to be selected.
+        :param exclude_filters: The exclude filters an object must not match any of to be selected.
+    """
+
+    include_key = tuple(include_filters) if include_filters is not None else None
+    exclude_key = tuple(exclude_filters) if exclude_filters is not None else None
+
+    try:
+        selector = _compile_filter_selector(include_key, exclude_key)
+    except TypeError:
+        selector = create_filter_selector(include_key, exclude_key)
+
+    return selector
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_filter_selector(include_key: Optional[Tuple[IIncludeFilter, ...]],
+                             exclude_key: Optional[Tuple[IExcludeFilter, ...]]) -> Callable[[Any], bool]:
+    # The cache is keyed by the filter objects themselves rather than their ids, the cache
+    # entry keeps the filters alive so an id can never be reused by a different filter.
+    return create_filter_selector(include_key, exclude_key)
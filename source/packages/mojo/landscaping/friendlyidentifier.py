@@ -18,15 +18,22 @@ __credits__ = []
 from typing import Optional, Union
 
 import re
+import sys
 
 from mojo.errors.exceptions import SemanticError
 
 class FriendlyIdentifier:
 
+    __slots__ = ("_full_identifier", "_hint", "_identity", "_identity_match")
+
     def __init__(self, full_identifier: str, hint: str, identity_match: Optional[Union[re.Pattern, str]]=None):
         self._full_identifier = full_identifier
         self._hint = hint
 
+        # The identity is used as the key for devices and services in the landscape tables, so it
+        # is resolved once and interned, lookups by identity can then match on the string identity.
+        self._identity = None
+
         self._identity_match = identity_match
         if self._identity_match is not None and isinstance(identity_match, str):
             self._identity_match = re.compile(identity_match)
@@ -56,15 +63,22 @@ class FriendlyIdentifier:
 
     @property
     def identity(self):
-        id = None
+        id = self._identity
 
-        if self._identity_match is not None:
-            mobj = self._identity_match.match(self._full_identifier)
-            id = mobj.groups()[0]
-        elif self._hint is not None:
-            id = self._hint
-        else:
-            id = self._full_identifier
+        if id is None:
+            if self._identity_match is not None:
+                mobj = self._identity_match.match(self._full_identifier)
+                id = mobj.groups()[0]
+            elif self._hint is not None:
+                id = self._hint
+            else:
+                id = self._full_identifier
+
+            # Only strings can be interned, any other identifier is cached as it is
+            if isinstance(id, str):
+                id = sys.intern(id)
+
+            self._identity = id
 
         return id
 
@@ -83,6 +97,7 @@ class FriendlyIdentifier:
 
     def update_full_identifier(self, full_identifer: str):
         self._full_identifier = full_identifer
+        self._identity = None
         return
 
     def __eq__(self, other):
@@ -27,6 +27,8 @@ class LandscapeDeviceGroup:
         grouping label.
     """
 
+    __slots__ = ("_label", "_items", "_coord_ref")
+
     def __init__(self, label: str, items: List[LandscapeDevice]) -> None:
         self._label = label
         self._items = items
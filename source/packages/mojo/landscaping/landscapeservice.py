@@ -16,7 +16,6 @@ __credits__ = []
 from typing import Callable, Dict, Union, TYPE_CHECKING
 
 import logging
-import os
 import threading
 import weakref
 
@@ -47,6 +46,12 @@ class LandscapeService(FeatureAttachedObject):
     # tags or not.
     FEATURE_TAGS = []
 
+    # Bit flags for the well known configuration features, these allow capability
+    # checks and filtering of services to be done with integer masks
+    FEATURE_POWER = 1 << 0
+    FEATURE_SERIAL = 1 << 1
+    FEATURE_ISOLATION = 1 << 2
+
     logger = logging.getLogger()
 
     def __init__(self, lscape: "Landscape", coordinator: "CoordinatorBase", friendly_id: 
@@ -54,7 +59,9 @@ class LandscapeService(FeatureAttachedObject):
         super().__init__()
 
         # These data items live for the life of the device, so they are not guarded
-        # by a lock
+        # by a lock.  A `weakref.ref` created without a callback is shared by all the
+        # callers that reference the same object, so services that reference the same
+        # landscape or coordinator share a single weakref object.
         self._lscape_ref = weakref.ref(lscape)
         self._coord_ref = weakref.ref(coordinator)
 
@@ -67,12 +74,12 @@ class LandscapeService(FeatureAttachedObject):
         self._contacted_first = None
         self._contacted_last = None
         self._is_watched = None
-        self._is_isolated = None
 
         self._extensions: Dict[str, ProtocolExtension] = {}
 
         self._table_for_match_callbacks = {}
         self._table_for_status_callbacks = {}
+        self._status_callbacks = ()
 
         self._credentials = {}
 
@@ -80,13 +87,17 @@ class LandscapeService(FeatureAttachedObject):
         if "name" in service_config:
             self._name = service_config["name"]
 
-        self._features = {}
-        if "features" in service_config:
-             self._features = service_config["features"]
+        self._features = service_config.get("features") or {}
+        self._is_isolated = None
+        self._feature_mask = 0
+        self._update_feature_state()
 
         self._configured_ipaddr = None
         if "ipaddr" in service_config:
-            self._configured_ip = service_config["ipaddr"]
+            self._configured_ipaddr = service_config["ipaddr"]
+
+        # The configured address of a service does not change, so we resolve it once
+        self._resolved_ipaddr = self._configured_ipaddr
 
         credmgr = lscape.credential_manager
 
@@ -106,7 +117,7 @@ class LandscapeService(FeatureAttachedObject):
 
     @property
     def configured_ipaddr(self) -> Union[str, None]:
-        return self._configured_ip
+        return self._configured_ipaddr
 
     @property
     def contacted_first(self) -> datetime:
@@ -163,6 +174,13 @@ class LandscapeService(FeatureAttachedObject):
         extdict = self._extensions.copy()
         return extdict
 
+    @property
+    def feature_mask(self) -> int:
+        """
+            An integer mask of the FEATURE_* flags configured for this service.
+        """
+        return self._feature_mask
+
     @property
     def friendly_id(self) -> FriendlyIdentifier:
         """
@@ -204,12 +222,12 @@ class LandscapeService(FeatureAttachedObject):
 
     @property
     def is_configured_for_power(self):
-        rtnval = True if "power" in self._features else False
+        rtnval = bool(self._feature_mask & self.FEATURE_POWER)
         return rtnval
     
     @property
     def is_configured_for_serial(self):
-        rtnval = True if "serial" in self._features else False
+        rtnval = bool(self._feature_mask & self.FEATURE_SERIAL)
         return rtnval
 
     @property
@@ -317,14 +335,13 @@ class LandscapeService(FeatureAttachedObject):
         """
             Initializes the features of the device based on the feature declarations and the information
             found in the feature config.
+
+            ..note: The features declared in the service configuration are processed when the
+                    service is constructed.  Derived types that add features to `_features` should
+                    call this method after doing so in order to update the feature mask and the
+                    isolation state used by the feature checks.
         """
-        if "features" in self._service_config:
-            feature_info = self._service_config["features"]
-            for fkey, fval in feature_info.items():
-                if fkey == "isolation":
-                    self._is_isolated = fval
-                elif fkey == "":
-                    pass
+        self._update_feature_state()
         return
 
     def match_using_params(self, match_type, *match_params) -> bool:
@@ -337,13 +354,11 @@ class LandscapeService(FeatureAttachedObject):
         match_func = None
         match_self = None
 
-        with self.begin_locked_scope(self._service_lock) as lk_locked:
+        with self._service_lock:
 
             if match_type in self._table_for_match_callbacks:
                 dext_attr, match_func = self._table_for_match_callbacks[match_type]
-                match_self = None
-                if hasattr(self, dext_attr):
-                    match_self = getattr(self, dext_attr)
+                match_self = getattr(self, dext_attr, None)
 
         if match_self is not None and match_func is not None:
             matches = match_func(match_self, *match_params)
@@ -365,7 +380,7 @@ class LandscapeService(FeatureAttachedObject):
             Method called  to update the match functions.
         """
 
-        with self.begin_locked_scope(self._service_lock) as lk_locked:
+        with self._service_lock:
 
             self._table_for_match_callbacks.update(match_table)
 
@@ -376,9 +391,10 @@ class LandscapeService(FeatureAttachedObject):
             Method called  to update the verification callback functions for a given protocol.
         """
 
-        with self.begin_locked_scope(self._service_lock) as lk_locked:
+        with self._service_lock:
 
             self._table_for_status_callbacks[protocol] = status_callback
+            self._status_callbacks = tuple(self._table_for_status_callbacks.values())
 
         return
 
@@ -387,50 +403,59 @@ class LandscapeService(FeatureAttachedObject):
             Verify the status of the specified device.
         """
 
-        for protocol, verify_status_callback in self._table_for_status_callbacks.items():
+        for verify_status_callback in self._status_callbacks:
             verify_status_callback()
 
         return
 
+    def _update_feature_state(self) -> None:
+        """
+            Updates the isolation state and the feature mask from the features of the service.
+        """
+        features = self._features
+
+        feature_mask = 0
+        if "power" in features:
+            feature_mask |= self.FEATURE_POWER
+        if "serial" in features:
+            feature_mask |= self.FEATURE_SERIAL
+        if "isolation" in features:
+            feature_mask |= self.FEATURE_ISOLATION
+
+        self._is_isolated = features.get("isolation")
+        self._feature_mask = feature_mask
+
+        return
+
     def _resolve_ipaddress(self) -> str:
 
-        ipaddr = None
+        ipaddr = self._resolved_ipaddr
 
-        if self._configured_ipaddr is not None:
-            ipaddr = self._configured_ipaddr
-        else:
+        if ipaddr is None:
             errmsg = f"_resolve_ipaddress: Unable to resolve IP address for dev {self}."
             raise RuntimeError(errmsg)
 
         return ipaddr
 
     def _repr_html_(self) -> str:
-        html_repr_lines = [
-            "<h1>LandscapeService</h1>",
-            "<h2>     type: {}</h2>".format(self._service_type),
-            "<h2>    identity: {}</h2>".format(self.identity),
-            "<h2>       ip: {}</h2>".format(self.ipaddr)
-        ]
-
-        html_repr = os.linesep.join(html_repr_lines)
+        html_repr = (
+            "<h1>LandscapeService</h1>\n"
+            f"<h2>     type: {self._service_type}</h2>\n"
+            f"<h2>    identity: {self.identity}</h2>\n"
+            f"<h2>       ip: {self.ipaddr}</h2>"
+        )
 
         return html_repr
 
     def __repr__(self) -> str:
 
-        thisType = type(self)
-
-        ipaddr = "unknown"
-
-        # Note: We may not have an assigned IP address, a repr function
-        # should never raise an exception so guard against a RuntimeException
-        # being raised if we dont have an IP
-        try:
-            ipaddr = self._resolve_ipaddress()
-        except RuntimeError:
-            pass
+        # Note: We may not have an assigned IP address, a repr function should never
+        # raise an exception so we use the cached address instead of resolving it
+        ipaddr = self._resolved_ipaddr
+        if ipaddr is None:
+            ipaddr = "unknown"
 
-        devstr = "<{} type={} identity={} ip={} >".format(thisType.__name__, self._service_type, self.identity, ipaddr)
+        devstr = f"<{type(self).__name__} type={self._service_type} identity={self.identity} ip={ipaddr} >"
 
         return devstr
 
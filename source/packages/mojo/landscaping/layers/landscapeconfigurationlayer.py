@@ -18,10 +18,20 @@ __credits__ = []
 from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 
 import json
+import logging
 import os
 import traceback
 import yaml
 
+from collections import defaultdict
+from dataclasses import dataclass
+
+# Prefer the libyaml based emitter when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as YamlSafeDumper
+except ImportError:
+    from yaml import SafeDumper as YamlSafeDumper
+
 from mojo.errors.exceptions import ConfigurationError
 
 from mojo.collections.mergemap import MergeMap
@@ -44,9 +54,22 @@ from mojo.landscaping.landscapeparameters import (
 if TYPE_CHECKING:
     from mojo.landscaping.landscape import Landscape
 
-APOD_RESERVED_SECTIONS = [
-    "controller"
-]
+RECORD_FILE_BUFFER_SIZE = 1 << 20
+
+APOD_RESERVED_SECTIONS = frozenset((
+    "controller",
+))
+
+@dataclass
+class LandscapeConfigs:
+    """
+        The device, power, serial and service configuration lists for a landscape, returned
+        together by :meth:`LandscapeConfigurationLayer.get_all_configs`.
+    """
+    devices: List[dict]
+    power: List[dict]
+    serial: List[dict]
+    services: List[dict]
 
 class LandscapeConfigurationLayer(LandscapingLayerBase):
     """
@@ -66,6 +89,10 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
         self._topology_files: List[str] = None
         self._topology_info: MergeMap = None
 
+        # The configuration lists are derived from the landscape info which does not change
+        # after it is loaded, so we cache them along with the landscape info they were built from
+        self._config_cache: Dict[str, Tuple[MergeMap, Any]] = {}
+
         # We can get runtime configuration from the global context which
         # should already be loaded
         self._global_context = ContextSingleton()
@@ -91,6 +118,23 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
     def topology_info(self) -> Union[MergeMap, None]:
         return self._topology_info
 
+    def get_all_configs(self) -> LandscapeConfigs:
+        """
+            Gets the device, power, serial and service configurations with a single acquisition
+            of the landscape lock.
+        """
+        lscape = self.landscape
+
+        with lscape.begin_locked_landscape_scope() as locked:
+            all_configs = LandscapeConfigs(
+                devices=self.locked_get_device_configs(),
+                power=self.locked_get_power_configs(),
+                serial=self.locked_get_serial_configs(),
+                services=self.locked_get_service_configs()
+            )
+
+        return all_configs
+
     def get_device_configs(self, include_filters: Optional[List[IIncludeFilter]]=None, exclude_filters: Optional[List[IExcludeFilter]]=None) -> List[dict]:
         lscape = self.landscape
 
@@ -99,28 +143,17 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
         with lscape.begin_locked_landscape_scope() as locked:
             candidate_configs = self.locked_get_device_configs()
 
-        selected_configs = []
+        selected_configs = candidate_configs
 
-        if include_filters is None:
-            selected_configs = candidate_configs
-        else:
-            while len(candidate_configs):
-                dev = candidate_configs.pop()
-                for ifilter in include_filters:
-                    if ifilter.should_include(dev):
-                        selected_configs.append(dev)
-                        break
+        if include_filters is not None:
+            selected_configs = [
+                dev for dev in selected_configs if any(ifilter.should_include(dev) for ifilter in include_filters)
+            ]
 
         if exclude_filters is not None:
-            candidate_configs = selected_configs
-
-            selected_configs = []
-
-            while len(candidate_configs):
-                dev = candidate_configs.pop()
-                for xfilter in exclude_filters:
-                    if not xfilter.should_exclude(dev):
-                        selected_configs.append(dev)
+            selected_configs = [
+                dev for dev in selected_configs if not any(xfilter.should_exclude(dev) for xfilter in exclude_filters)
+            ]
 
         return selected_configs
 
@@ -147,13 +180,32 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
     def get_service_configs(self, include_filters: Optional[List[IIncludeFilter]]=None, exclude_filters: Optional[List[IExcludeFilter]]=None) -> List[dict]:
         lscape = self.landscape
 
-        service_configs = []
-
-        with lscape.begin_locked_landscape_scope() as locked:
-            service_configs = self.locked_get_service_configs()
+        cached = self._peek_cached("service")
+        if cached is not None:
+            service_configs = list(cached)
+        else:
+            with lscape.begin_locked_landscape_scope() as locked:
+                service_configs = self.locked_get_service_configs()
 
         return service_configs
 
+    def get_service_configs_by_type(self, service_type: str) -> List[dict]:
+        """
+            Returns the list of service configurations for the specified service type.  Each service
+            coupling calls this when it is attached to the environment, so once the configurations
+            are cached for the current landscape info they are returned without taking the landscape
+            lock.
+        """
+        lscape = self.landscape
+
+        configs_by_type = self._peek_cached("service_by_type")
+        if configs_by_type is not None:
+            service_configs = list(configs_by_type.get(service_type, ()))
+        else:
+            with lscape.begin_locked_landscape_scope() as locked:
+                service_configs = self.locked_get_service_configs_by_type(service_type)
+
+        return service_configs
 
     def attach_to_environment(self):
 
@@ -188,6 +240,8 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
 
             self._landscape_info = CONFIGURATION_MAPS.LANDSCAPE_CONFIGURATION_MAP
 
+            self._config_cache.clear()
+
             errors, warnings = self.validate_landscape(self._landscape_info)
 
             if len(errors) > 0:
@@ -200,9 +254,16 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
                 errmsg = os.linesep.join(errmsg_lines)
                 raise ConfigurationError(errmsg) from None
 
-            if len(warnings) > 0:
+            if len(warnings) > 0 and self.logger.isEnabledFor(logging.WARNING):
+                wrnmsg_lines = ["Landscape Configuration Warnings:"]
                 for wrn_path, wrn_msg in warnings:
-                    self.logger.warn("Landscape Configuration Warning: ({}) {}".format(wrn_path, wrn_msg))
+                    wrnmsg_lines.append(f"    ({wrn_path}) {wrn_msg}")
+
+                wrnmsg = os.linesep.join(wrnmsg_lines)
+                self.logger.warning(wrnmsg)
+
+            # Build the flattened configuration lists once now that the landscape is validated
+            self._build_config_cache()
 
         return self._landscape_info
 
@@ -229,9 +290,13 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
                 errmsg = os.linesep.join(errmsg_lines)
                 raise ConfigurationError(errmsg) from None
 
-            if len(warnings) > 0:
+            if len(warnings) > 0 and self.logger.isEnabledFor(logging.WARNING):
+                wrnmsg_lines = ["Topology Configuration Warnings:"]
                 for wrn_path, wrn_msg in warnings:
-                    self.logger.warn("Topology Configuration Warning: ({}) {}".format(wrn_path, wrn_msg))
+                    wrnmsg_lines.append(f"    ({wrn_path}) {wrn_msg}")
+
+                wrnmsg = os.linesep.join(wrnmsg_lines)
+                self.logger.warning(wrnmsg)
 
         return self._topology_info
 
@@ -244,23 +309,8 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
             ..note: It is assumed that this call is being made in a thread safe context
                     or with the landscape lock held.
         """
-
-        device_config_list = []
-
-        if "apod" in self._landscape_info:
-            pod_info = self._landscape_info["apod"]
-
-            for devsection in pod_info.keys():
-                if devsection not in APOD_RESERVED_SECTIONS:
-                    section_items = pod_info[devsection]
-                    for dev_config_info in section_items:
-                        if "skip" in dev_config_info and dev_config_info["skip"]:
-                            continue
-                        dev_config_info["section"] = devsection
-                        device_config_list.append(dev_config_info)
-
-        return device_config_list
-
+        device_configs = self._get_cached_configs("device", self._build_device_configs)
+        return device_configs
 
     def locked_get_power_configs(self) -> List[dict]:
         """
@@ -270,17 +320,9 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
             ..note: It is assumed that this call is being made in a thread safe context
                     or with the landscape lock held.
         """
+        power_configs = self._get_cached_configs("power", self._build_power_configs)
+        return power_configs
 
-        power_config_list = []
-
-        if "apod" in self._landscape_info:
-            pod_info = self._landscape_info["apod"]
-            if "power" in pod_info:
-                for power_config_info in pod_info["power"]:
-                    power_config_list.append(power_config_info)
-
-        return power_config_list
-    
     def locked_get_serial_configs(self) -> List[dict]:
         """
             Returns the list of serial manager configurations from the landscape.  This will
@@ -289,16 +331,8 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
             ..note: It is assumed that this call is being made in a thread safe context
                     or with the landscape lock held.
         """
-
-        serial_config_list = []
-
-        if "apod" in self._landscape_info:
-            pod_info = self._landscape_info["apod"]
-            if "serial" in pod_info:
-                for serial_config_info in pod_info["serial"]:
-                    serial_config_list.append(serial_config_info)
-
-        return serial_config_list
+        serial_configs = self._get_cached_configs("serial", self._build_serial_configs)
+        return serial_configs
 
     def locked_get_service_configs(self) -> List[dict]:
         """
@@ -308,35 +342,38 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
             ..note: It is assumed that this call is being made in a thread safe context
                     or with the landscape lock held.
         """
+        service_configs = self._get_cached_configs("service", self._build_service_configs)
+        return service_configs
 
-        service_config_list = []
-
-        if "infrastructure" in self._landscape_info:
-            infrastructure_info = self._landscape_info["infrastructure"]
-            if "services" in infrastructure_info:
-                for svc_config_info in infrastructure_info["services"]:
-                    if "skip" in svc_config_info and svc_config_info["skip"]:
-                        continue
-                    service_config_list.append(svc_config_info)
+    def locked_get_service_configs_by_type(self, service_type: str) -> List[dict]:
+        """
+            Returns the list of service configurations from the landscape for the specified
+            service type.  The services are grouped by type once when the configuration is
+            cached, so this does not scan all of the service configurations.
 
-        return service_config_list
+            ..note: It is assumed that this call is being made in a thread safe context
+                    or with the landscape lock held.
+        """
+        configs_by_type = self._get_cached("service_by_type", self._build_service_configs_by_type)
+        service_configs = list(configs_by_type.get(service_type, ()))
+        return service_configs
 
     def record_configuration(self, log_to_directory: str):
         """
             Method code to record the landscape configuration to an output folder
         """
-        
+
         if self._landscape_info is not None:
             landscape_info_copy = self._landscape_info.flatten()
             landscape_declared_file = None
 
             try:
                 landscape_declared_file = os.path.join(log_to_directory, "landscape-declared.yaml")
-                with open(landscape_declared_file, 'w') as lsf:
-                    yaml.safe_dump(landscape_info_copy, lsf, indent=4, default_flow_style=False)
+                with open(landscape_declared_file, 'w', buffering=RECORD_FILE_BUFFER_SIZE) as lsf:
+                    yaml.dump(landscape_info_copy, lsf, Dumper=YamlSafeDumper, indent=4, default_flow_style=False, sort_keys=False)
 
                 landscape_declared_file = os.path.join(log_to_directory, "landscape-declared.json")
-                with open(landscape_declared_file, 'w') as lsf:
+                with open(landscape_declared_file, 'w', buffering=RECORD_FILE_BUFFER_SIZE) as lsf:
                     json.dump(landscape_info_copy, lsf, indent=4)
 
             except Exception as xcpt:
@@ -350,11 +387,11 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
 
             try:
                 topology_declared_file = os.path.join(log_to_directory, "topology-declared.yaml")
-                with open(topology_declared_file, 'w') as lsf:
-                    yaml.safe_dump(topology_info_copy, lsf, indent=4, default_flow_style=False)
+                with open(topology_declared_file, 'w', buffering=RECORD_FILE_BUFFER_SIZE) as lsf:
+                    yaml.dump(topology_info_copy, lsf, Dumper=YamlSafeDumper, indent=4, default_flow_style=False, sort_keys=False)
 
                 topology_declared_file = os.path.join(log_to_directory, "topology-declared.json")
-                with open(topology_declared_file, 'w') as lsf:
+                with open(topology_declared_file, 'w', buffering=RECORD_FILE_BUFFER_SIZE) as lsf:
                     json.dump(topology_info_copy, lsf, indent=4)
 
             except Exception as xcpt:
@@ -428,24 +465,47 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
 
         lscape: "Landscape" = self.landscape
 
-        remaining_items = [item for item in section_items]
+        section_couplings = [
+            coupling for coupling in lscape.installed_integration_couplings.values() if coupling.integration_section == section
+        ]
+
+        # Index the section items once by the (leaf, class) pairs the couplings for this section match
+        # on, so each coupling only looks at the items that it declares an integration for.  Items with
+        # a leaf value that cannot be hashed, like a list or dict, are kept aside and compared by value.
+        items_by_leaf_class: Dict[Tuple[str, Any], List[Dict[str, Any]]] = defaultdict(list)
+        unhashable_items_by_leaf: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for leaf in {coupling.integration_leaf for coupling in section_couplings}:
+            for nxt_item in section_items:
+                if leaf in nxt_item:
+                    try:
+                        items_by_leaf_class[(leaf, nxt_item[leaf])].append(nxt_item)
+                    except TypeError:
+                        unhashable_items_by_leaf[leaf].append(nxt_item)
 
-        for nxt_coupling_type in lscape.installed_integration_couplings.values():
+        validated_ids = set()
 
-            if nxt_coupling_type.integration_section == section:
-                validated_items = []
+        errors_extend = errors.extend
+        warnings_extend = warnings.extend
 
-                for nxt_item in remaining_items:
-                    if nxt_coupling_type.integration_leaf in nxt_item:
-                        nxt_class = nxt_item[nxt_coupling_type.integration_leaf]
-                        if nxt_class == nxt_coupling_type.integration_class:
-                            ierrors, iwarnings = nxt_coupling_type.validate_item_configuration(nxt_item)
-                            errors.extend(ierrors)
-                            warnings.extend(iwarnings)
-                            validated_items.append(nxt_item)
+        for nxt_coupling_type in section_couplings:
 
-                for item in validated_items:
-                    remaining_items.remove(item)
+            leaf = nxt_coupling_type.integration_leaf
+            integ_class = nxt_coupling_type.integration_class
+
+            matching_items = items_by_leaf_class.get((leaf, integ_class), [])
+
+            unhashable_items = unhashable_items_by_leaf.get(leaf)
+            if unhashable_items:
+                matching_items = matching_items + [
+                    item for item in unhashable_items if item[leaf] == integ_class
+                ]
+
+            for nxt_item in matching_items:
+                if id(nxt_item) not in validated_ids:
+                    ierrors, iwarnings = nxt_coupling_type.validate_item_configuration(nxt_item)
+                    errors_extend(ierrors)
+                    warnings_extend(iwarnings)
+                    validated_ids.add(id(nxt_item))
 
         return errors, warnings
 
@@ -469,3 +529,118 @@ class LandscapeConfigurationLayer(LandscapingLayerBase):
 
         return errors, warnings
 
+    def _build_config_cache(self) -> None:
+        """
+            Builds the cached lists of device, power, serial and service configurations for the
+            current landscape info.
+        """
+        landscape_info = self._landscape_info
+
+        self._config_cache = {
+            "device": (landscape_info, self._build_device_configs()),
+            "power": (landscape_info, self._build_power_configs()),
+            "serial": (landscape_info, self._build_serial_configs()),
+            "service": (landscape_info, self._build_service_configs())
+        }
+
+        self._config_cache["service_by_type"] = (landscape_info, self._build_service_configs_by_type())
+
+        return
+
+    def _build_device_configs(self) -> List[dict]:
+
+        device_config_list = []
+
+        if "apod" in self._landscape_info:
+            pod_info = self._landscape_info["apod"]
+
+            for devsection in pod_info.keys():
+                if devsection not in APOD_RESERVED_SECTIONS:
+                    for dev_config_info in pod_info[devsection]:
+                        if dev_config_info.get("skip", False):
+                            continue
+                        # Tag a copy of the config with its section so we don't write into the
+                        # shared landscape configuration
+                        device_config_list.append({**dev_config_info, "section": devsection})
+
+        return device_config_list
+
+    def _build_power_configs(self) -> List[dict]:
+
+        power_config_list = []
+
+        if "apod" in self._landscape_info:
+            pod_info = self._landscape_info["apod"]
+            if "power" in pod_info:
+                power_config_list = list(pod_info["power"])
+
+        return power_config_list
+
+    def _build_serial_configs(self) -> List[dict]:
+
+        serial_config_list = []
+
+        if "apod" in self._landscape_info:
+            pod_info = self._landscape_info["apod"]
+            if "serial" in pod_info:
+                serial_config_list = list(pod_info["serial"])
+
+        return serial_config_list
+
+    def _build_service_configs(self) -> List[dict]:
+
+        service_config_list = []
+
+        if "infrastructure" in self._landscape_info:
+            infrastructure_info = self._landscape_info["infrastructure"]
+            if "services" in infrastructure_info:
+                for svc_config_info in infrastructure_info["services"]:
+                    if "skip" in svc_config_info and svc_config_info["skip"]:
+                        continue
+                    service_config_list.append(svc_config_info)
+
+        return service_config_list
+
+    def _build_service_configs_by_type(self) -> Dict[str, List[dict]]:
+
+        configs_by_type = defaultdict(list)
+
+        for svc_config_info in self._get_cached("service", self._build_service_configs):
+            configs_by_type[svc_config_info["serviceType"]].append(svc_config_info)
+
+        return dict(configs_by_type)
+
+    def _get_cached(self, config_kind: str, build_func) -> Any:
+        """
+            Returns the cached configuration table of the specified kind, the table is rebuilt
+            using `build_func` if the landscape info has changed since it was cached.
+        """
+        landscape_info = self._landscape_info
+
+        cached = self._config_cache.get(config_kind)
+        if cached is None or cached[0] is not landscape_info:
+            cached = (landscape_info, build_func())
+            self._config_cache[config_kind] = cached
+
+        return cached[1]
+
+    def _get_cached_configs(self, config_kind: str, build_func) -> List[dict]:
+        """
+            Returns a copy of the cached list of configurations of the specified kind.
+        """
+        config_list = list(self._get_cached(config_kind, build_func))
+        return config_list
+
+    def _peek_cached(self, config_kind: str) -> Any:
+        """
+            Returns the cached configuration table of the specified kind if it is cached for the
+            current landscape info, otherwise returns `None`.  Cache entries are immutable tuples
+            so this is safe to call without holding the landscape lock.
+        """
+        table = None
+
+        cached = self._config_cache.get(config_kind)
+        if cached is not None and cached[0] is self._landscape_info:
+            table = cached[1]
+
+        return table
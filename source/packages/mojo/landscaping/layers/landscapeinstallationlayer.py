@@ -15,7 +15,9 @@ __credits__ = []
 
 
 
-from typing import Dict, TYPE_CHECKING
+from typing import Dict, Optional, TYPE_CHECKING
+
+import threading
 
 from mojo.extension.wellknown import ConfiguredSuperFactorySingleton
 
@@ -33,9 +35,11 @@ class LandscapeInstallationLayer(LandscapingLayerBase):
     def __init__(self, lscape: "Landscape"):
         super().__init__(lscape)
 
-        self._installed_integration_couplings: Dict[str, IntegrationCouplingType] = {}
+        # The installed integration couplings are loaded on first use, the table is only
+        # published once it has been completely loaded
+        self._installed_integration_couplings: Optional[Dict[str, IntegrationCouplingType]] = None
+        self._installed_integration_couplings_lock = threading.Lock()
 
-        self._load_integration_coupling_types()
         return
 
     @property
@@ -43,9 +47,19 @@ class LandscapeInstallationLayer(LandscapingLayerBase):
         """
             Returns a table of the installed integration couplings found.
         """
-        return self._installed_integration_couplings
+        installed_couplings = self._installed_integration_couplings
+        if installed_couplings is None:
+            with self._installed_integration_couplings_lock:
+                installed_couplings = self._installed_integration_couplings
+                if installed_couplings is None:
+                    installed_couplings = self._load_integration_coupling_types()
+                    self._installed_integration_couplings = installed_couplings
+
+        return installed_couplings
 
-    def _load_integration_coupling_types(self):
+    def _load_integration_coupling_types(self) -> Dict[str, IntegrationCouplingType]:
+
+        installed_couplings = {}
 
         super_factory = ConfiguredSuperFactorySingleton()
         for integration_coupling_types in super_factory.iterate_override_types_for_each(
@@ -54,6 +68,6 @@ class LandscapeInstallationLayer(LandscapingLayerBase):
             for itype in integration_coupling_types:
                 itype: IntegrationCouplingType = itype
                 integration_key = itype.get_integration_key()
-                self._installed_integration_couplings[integration_key] = itype
+                installed_couplings[integration_key] = itype
 
-        return
+        return installed_couplings
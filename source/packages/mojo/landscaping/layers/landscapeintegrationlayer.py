@@ -15,7 +15,13 @@ __credits__ = []
 
 
 
-from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from typing import Any, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING
+
+import sys
+import threading
+
+from collections import defaultdict
+from types import MappingProxyType
 
 from mojo.errors.exceptions import SemanticError
 
@@ -27,8 +33,8 @@ from mojo.xmods.injection.coupling.integrationcoupling import IntegrationCouplin
 from mojo.landscaping.constants import DeviceExtensionType
 from mojo.landscaping.coordinators.coordinatorbase import CoordinatorBase
 from mojo.landscaping.coupling.coordinatorcoupling import CoordinatorCoupling
+from mojo.landscaping.filtering import compile_filter_selector
 from mojo.landscaping.layers.landscapinglayerbase import LandscapingLayerBase
-from mojo.landscaping.layers.landscapeconfigurationlayer import LandscapeConfigurationLayer
 from mojo.landscaping.friendlyidentifier import FriendlyIdentifier
 from mojo.landscaping.landscapedevice import LandscapeDevice
 from mojo.landscaping.landscapedevicegroup import LandscapeDeviceGroup
@@ -42,173 +48,81 @@ if TYPE_CHECKING:
     from mojo.landscaping.landscape import Landscape
 
 
+def _read_only_table_property(attr_name: str, doc: Optional[str]=None) -> property:
+    """
+        Creates a property that returns a read-only view of the copy-on-write table
+        stored in the attribute named `attr_name`.
+    """
+    def getter(self) -> Mapping[str, Any]:
+        return MappingProxyType(getattr(self, attr_name))
+
+    return property(getter, doc=doc)
+
+
 class LandscapeIntegrationLayer(LandscapingLayerBase):
+    """
+        The :class:`LandscapeIntegrationLayer` tables of coordinators, devices and services are
+        copy-on-write.  Writers build a new table and publish it by rebinding the attribute, so
+        readers can be handed a read-only view of the current table without taking a lock.
+    """
 
     def __init__(self, lscape: "Landscape"):
         super().__init__(lscape)
+
+        # Writers to the integration tables are serialized by a lock that belongs to the layer
+        # so they don't contend with unrelated landscape state.  Readers don't need a lock,
+        # because the tables are copy-on-write.
+        self._integration_lock = threading.RLock()
+
         self._integrated_devices: Dict[str, LandscapeDevice] = None
         self._integrated_power: Dict[str, Any] = None
         self._integrated_serial: Dict[str, Any] = None
         self._integrated_services: Dict[str, LandscapeService] = None
+        self._integrated_services_by_type: Dict[str, List[LandscapeService]] = {}
 
         self._integrated_device_groups: Dict[str, LandscapeDeviceGroup] = {}
 
+        self._devices_by_ext_type: Dict[DeviceExtensionType, Dict[str, LandscapeDevice]] = {}
+
         self._requested_integration_couplings: Dict[str, IntegrationCouplingType] = {}
 
+        # Index of the requested couplings by the components of their integration key, so configs
+        # can be matched to a coupling without formatting an integration key string for each config
+        self._requested_integration_couplings_indexed: Dict[Tuple[str, ...], Tuple[str, IntegrationCouplingType]] = {}
+
         self._coordinators_for_devices = {}
         self._coordinators_for_power = {}
         self._coordinators_for_serial = {}
         self._coordinators_for_services = {}
-
-        self._power_request_count = 0
-        self._serial_request_count = 0
         return
     
-    @property
-    def coordinators_for_devices(self) -> Dict[str, CoordinatorBase]:
-        coord_table = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            coord_table = self._coordinators_for_devices.copy()
-
-        return coord_table
-    
-    @property
-    def coordinators_for_power(self) -> Dict[str, CoordinatorBase]:
-        coord_table = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            coord_table = self._coordinators_for_power.copy()
-
-        return coord_table
-    
-    @property
-    def coordinators_for_serial(self) -> Dict[str, CoordinatorBase]:
-        coord_table = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            coord_table = self._coordinators_for_serial.copy()
-
-        return coord_table
-
-    @property
-    def coordinators_for_services(self) -> Dict[str, CoordinatorBase]:
-        coord_table = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            coord_table = self._coordinators_for_services.copy()
-
-        return coord_table
-
-    @property
-    def integrated_device_groups(self) -> Dict[str, LandscapeDeviceGroup]:
-        """
-            Provides a thread safe copy of the integration device group dictionary.
-        """
-        idevicegroups = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            idevicegroups = self._integrated_device_groups.copy()
-
-        return idevicegroups
-
-    @property
-    def integrated_devices(self) -> Dict[str, LandscapeDevice]:
-        """
-            Provides a thread safe copy of the integration device dictionary.
-        """
-        idevices = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            idevices = self._integrated_devices.copy()
-
-        return idevices
-    
-    @property
-    def integrated_power(self) -> Dict[str, Any]:
-        """
-            Provides a thread safe copy of the integration power dictionary.
-        """
-        ipower = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            ipower = self._integrated_power.copy()
-
-        return ipower
-    
-    @property
-    def integrated_serial(self) -> Dict[str, Any]:
-        """
-            Provides a thread safe copy of the integration serial dictionary.
-        """
-        iserial = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            iserial = self._integrated_serial.copy()
-
-        return iserial
-
-    @property
-    def integrated_services(self) -> Dict[str, LandscapeService]:
-        """
-            Provides a thread safe copy of the integration services dictionary.
-        """
-        iservices = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            iservices = self._integrated_services.copy()
-
-        return iservices
-
-    @property
-    def requested_integration_couplings(self) -> Dict[str, IntegrationCouplingType]:
-        """
-            Returns a table of the installed integration couplings found.
-        """
-        return self._requested_integration_couplings
+    coordinators_for_devices = _read_only_table_property("_coordinators_for_devices")
+    coordinators_for_power = _read_only_table_property("_coordinators_for_power")
+    coordinators_for_serial = _read_only_table_property("_coordinators_for_serial")
+    coordinators_for_services = _read_only_table_property("_coordinators_for_services")
+
+    integrated_device_groups = _read_only_table_property("_integrated_device_groups",
+        "Provides a thread safe read-only view of the integration device group dictionary.")
+    integrated_devices = _read_only_table_property("_integrated_devices",
+        "Provides a thread safe read-only view of the integration device dictionary.")
+    integrated_power = _read_only_table_property("_integrated_power",
+        "Provides a thread safe read-only view of the integration power dictionary.")
+    integrated_serial = _read_only_table_property("_integrated_serial",
+        "Provides a thread safe read-only view of the integration serial dictionary.")
+    integrated_services = _read_only_table_property("_integrated_services",
+        "Provides a thread safe read-only view of the integration services dictionary.")
+
+    requested_integration_couplings = _read_only_table_property("_requested_integration_couplings",
+        "Returns a table of the installed integration couplings found.")
 
     def get_devices(self, include_filters: Optional[List[IIncludeFilter]]=None, exclude_filters: Optional[List[IExcludeFilter]]=None) -> LandscapeDevice:
         """
             Gets a copy of the integrated devices list.
         """
-        lscape = self.landscape
-
-        candidate_devices = None
+        candidate_devices = list(self._integrated_devices.values())
 
-        with lscape.begin_locked_landscape_scope() as locked:
-            candidate_devices = [dev for dev in self._integrated_devices.values()]
-        
-        selected_devices = []
-
-        if include_filters is None:
-            selected_devices = candidate_devices
-        else:
-            while len(candidate_devices):
-                dev = candidate_devices.pop()
-                for ifilter in include_filters:
-                    if ifilter.should_include(dev):
-                        selected_devices.append(dev)
-                        break
-
-        if exclude_filters is not None:
-            candidate_devices = selected_devices
-
-            selected_devices = []
-
-            while len(candidate_devices):
-                dev = candidate_devices.pop()
-                for xfilter in exclude_filters:
-                    if not xfilter.should_exclude(dev):
-                        selected_devices.append(dev)
+        selector = compile_filter_selector(include_filters, exclude_filters)
+        selected_devices = [dev for dev in candidate_devices if selector(dev)]
 
         return selected_devices
     
@@ -216,79 +130,71 @@ class LandscapeIntegrationLayer(LandscapingLayerBase):
         """
             Gets a copy of the integrated service list.
         """
-        lscape = self.landscape
-
-        candidate_services = None
+        candidate_services = list(self._integrated_services.values())
 
-        with lscape.begin_locked_landscape_scope() as locked:
-            candidate_services = [svc for svc in self._integrated_services.values()]
-        
-        selected_services = []
-
-        if include_filters is None:
-            selected_services = candidate_services
-        else:
-            while len(candidate_services):
-                svc = candidate_services.pop()
-                for ifilter in include_filters:
-                    if ifilter.should_include(svc):
-                        selected_services.append(svc)
-                        break
-
-        if exclude_filters is not None:
-            candidate_services = selected_services
-
-            selected_services = []
-
-            while len(candidate_services):
-                svc = candidate_services.pop()
-                for xfilter in exclude_filters:
-                    if not xfilter.should_exclude(svc):
-                        selected_services.append(svc)
+        selector = compile_filter_selector(include_filters, exclude_filters)
+        selected_services = [svc for svc in candidate_services if selector(svc)]
 
         return selected_services
 
+    def get_services_by_type(self, service_type: str) -> List[LandscapeService]:
+        """
+            Gets a copy of the list of integrated services of the specified service type.
+        """
+        services_of_type = list(self._integrated_services_by_type.get(service_type, ()))
+        return services_of_type
+
     def initialize_landscape(self, activation_params: LandscapeActivationParams):
 
         lscape = self.landscape
 
-        devices = None
-        with lscape.begin_locked_landscape_scope() as locked:
+        with self._integration_lock:
 
             layer_config = lscape.layer_configuration
 
             if layer_config.landscape_info is not None:
 
+                all_configs = layer_config.get_all_configs()
+
                 if not activation_params.disable_device_activation:
                     # Initialize the devices so we know what they are, this will create a LandscapeDevice object for each device
                     # and register it in the all_devices table where it can be found by the device coordinators for further activation
-                    devices = self._initialize_landscape_devices(layer_config)
+                    devices, dev_group_table, power_request_count, serial_request_count = \
+                        self._initialize_landscape_devices(all_configs.devices)
 
-                    if self._power_request_count > 0:
-                        self._initialize_landscape_power(layer_config)
+                    if power_request_count > 0:
+                        self._initialize_landscape_power(all_configs.power)
 
-                    if self._serial_request_count > 0:
-                        self._initialize_landscape_serial(layer_config)
+                    if serial_request_count > 0:
+                        self._initialize_landscape_serial(all_configs.serial)
                 else:
                     self.logger.info("LandscapeIntegrationLayer: 'Device Activation' was disabled.")
                     devices = {}
+                    dev_group_table = {}
 
                 if not activation_params.disable_service_activation:
-                    services = self._initialize_landscape_services(layer_config)
+                    services = self._initialize_landscape_services(all_configs.services)
                 else:
                     self.logger.info("LandscapeIntegrationLayer: 'Service Activation' was disabled.")
                     services = {}
 
-                self._integrated_devices = devices.copy()
-                self._integrated_services = services.copy()
+                services_by_type = defaultdict(list)
+                for lssvc in services.values():
+                    services_by_type[lssvc.service_type].append(lssvc)
+
+                self._integrated_devices = devices
+                self._integrated_services = services
+                self._integrated_services_by_type = dict(services_by_type)
             else:
                 devices = {}
+                dev_group_table = {}
                 self._integrated_devices = {}
                 self._integrated_power = {}
                 self._integrated_serial = {}
                 self._integrated_services = {}
+                self._integrated_services_by_type = {}
 
-        self._initialize_landscape_device_groups()
+            self._initialize_landscape_device_groups(dev_group_table)
 
         return
 
@@ -303,15 +209,7 @@ class LandscapeIntegrationLayer(LandscapingLayerBase):
             :param device: The device being registered.
         """
 
-        ext_for_type_table = None
-        
-        if ext_type in self._devices_by_ext_type:
-            ext_for_type_table = self._devices_by_ext_type[ext_type]
-        else:
-            ext_for_type_table = {}
-            self._devices_by_ext_type[ext_type] = ext_for_type_table
-        
-        ext_for_type_table[device.identity] = device
+        self._devices_by_ext_type.setdefault(ext_type, {})[device.identity] = device
 
         return
 
@@ -326,11 +224,14 @@ class LandscapeIntegrationLayer(LandscapingLayerBase):
             :param coupling: The coupling to register for the associated role.
         """
 
-        lscape = self.landscape
+        with self._integration_lock:
+            integ_key = sys.intern(coupling.get_integration_key())
+            self._requested_integration_couplings = {**self._requested_integration_couplings, integ_key: coupling}
 
-        with lscape.begin_locked_landscape_scope() as locked:
-            integ_key = coupling.get_integration_key()
-            self._requested_integration_couplings[integ_key] = coupling
+            integ_key_parts = tuple(sys.intern(kpart) for kpart in integ_key.split(":", 3))
+            self._requested_integration_couplings_indexed = {
+                **self._requested_integration_couplings_indexed, integ_key_parts: (integ_key, coupling)
+            }
 
         return
 
@@ -339,76 +240,83 @@ class LandscapeIntegrationLayer(LandscapingLayerBase):
         return
     
 
-    def _initialize_landscape_device_groups(self):
-
-        dev_group_table = {}
+    def _initialize_landscape_device_groups(self, dev_group_table: Dict[str, List[LandscapeDevice]]):
 
-        for dev_obj in self._integrated_devices.values():
-            group_name = dev_obj.group
-            if group_name != "":
-                device_list = None
-                if group_name in dev_group_table:
-                    device_list = dev_group_table[group_name]
-                else:
-                    device_list = []
-                    dev_group_table[group_name] = device_list
-                device_list.append(dev_obj)
-        
-        for group_name, group_items in dev_group_table.items():
-            device_group = LandscapeDeviceGroup(group_name, group_items)
-            self._integrated_device_groups[group_name] = device_group
+        self._integrated_device_groups = {
+            group_name: LandscapeDeviceGroup(group_name, group_items)
+            for group_name, group_items in dev_group_table.items()
+        }
 
         return 
     
 
-    def _initialize_landscape_devices(self, layer_config: LandscapeConfigurationLayer) -> Dict[FriendlyIdentifier, LandscapeDevice]:
+    def _initialize_landscape_devices(self, device_configs: List[dict]) -> Tuple[Dict[FriendlyIdentifier, LandscapeDevice], Dict[str, List[LandscapeDevice]], int, int]:
 
         unrecognized_device_configs = []
 
         devices: Dict[FriendlyIdentifier: LandscapeDevice] = {}
 
-        requested_coupling_table = self._requested_integration_couplings
+        # Devices are bucketed by group as they are created so the device groups can be
+        # built without making a second pass over the devices
+        dev_group_table: Dict[str, List[LandscapeDevice]] = defaultdict(list)
 
-        device_configs = layer_config.get_device_configs()
+        power_request_count = 0
+        serial_request_count = 0
+
+        requested_coupling_index = self._requested_integration_couplings_indexed
+
+        # The coordinator tables are copy-on-write, we update a copy and then publish it
+        coordinators = dict(self._coordinators_for_devices)
 
         if len(device_configs) > 0:
             lscape = self.landscape
 
+            # The first pass matches the configs to their couplings and creates all the coordinators
+            # that are needed before any devices are created, so a coordinator is fully set up
+            # before it is asked for its first device.
+            coordinated_configs = []
+
             for dev_config_info in device_configs:
                 dev_type = dev_config_info["deviceType"]
                 dev_section = dev_config_info["section"]
-                dev_integ_key = f"apod:{dev_section}:deviceType:{dev_type}"
 
-                if dev_integ_key in requested_coupling_table:
-                    coord_coupling: CoordinatorCoupling = requested_coupling_table[dev_integ_key]
+                coupling_entry = requested_coupling_index.get(("apod", dev_section, "deviceType", dev_type))
+
+                if coupling_entry is not None:
+                    dev_integ_key, coord_coupling = coupling_entry
 
                     # If we don't have a device coordinator for this type of device yet,
                     # create one.
-                    coordinator = None
-                    if dev_integ_key in self._coordinators_for_devices:
-                        coordinator = self._coordinators_for_devices[dev_integ_key]
-                    else:
+                    coordinator = coordinators.get(dev_integ_key)
+                    if coordinator is None:
                         coordinator = coord_coupling.create_coordinator(lscape)
-                        self._coordinators_for_devices[dev_integ_key] = coordinator
+                        coordinators[dev_integ_key] = coordinator
+
+                    coordinated_configs.append((coordinator, dev_config_info))
+                else:
+                    unrecognized_device_configs.append(dev_config_info)
 
-                    friendly_id, lsdevice = coordinator.create_landscape_device(lscape, dev_config_info)
+            for coordinator, dev_config_info in coordinated_configs:
+                friendly_id, lsdevice = coordinator.create_landscape_device(lscape, dev_config_info)
 
-                    if lsdevice.is_configured_for_power:
-                        self._power_request_count += 1
+                if lsdevice.is_configured_for_power:
+                    power_request_count += 1
 
-                    if lsdevice.is_configured_for_serial:
-                        self._serial_request_count += 1
+                if lsdevice.is_configured_for_serial:
+                    serial_request_count += 1
 
-                    devices[friendly_id.identity] = lsdevice
-                else:
-                    unrecognized_device_configs.append(dev_config_info)
+                devices[friendly_id.identity] = lsdevice
 
-        return devices
+                group_name = lsdevice.group
+                if group_name != "":
+                    dev_group_table[group_name].append(lsdevice)
 
+        self._coordinators_for_devices = coordinators
 
-    def _initialize_landscape_power(self, layer_config: LandscapeConfigurationLayer):
+        return devices, dev_group_table, power_request_count, serial_request_count
 
-        power_configs = layer_config.get_power_configs()
+
+    def _initialize_landscape_power(self, power_configs: List[dict]):
 
         if len(power_configs) > 0:
             lscape = self.landscape
@@ -420,9 +328,7 @@ class LandscapeIntegrationLayer(LandscapingLayerBase):
         return
 
 
-    def _initialize_landscape_serial(self, layer_config: LandscapeConfigurationLayer):
-
-        serial_configs = layer_config.get_serial_configs()
+    def _initialize_landscape_serial(self, serial_configs: List[dict]):
 
         if len(serial_configs) > 0:
             lscape = self.landscape
@@ -433,39 +339,48 @@ class LandscapeIntegrationLayer(LandscapingLayerBase):
 
         return
 
-    def _initialize_landscape_services(self, layer_config: LandscapeConfigurationLayer) -> Dict[FriendlyIdentifier, LandscapeService]:
+    def _initialize_landscape_services(self, service_configs: List[dict]) -> Dict[FriendlyIdentifier, LandscapeService]:
 
         unrecognized_service_configs = []
 
         services: Dict[FriendlyIdentifier: LandscapeService] = {}
 
-        requested_coupling_table = self._requested_integration_couplings
+        requested_coupling_index = self._requested_integration_couplings_indexed
 
-        service_configs = layer_config.get_service_configs()
+        # The coordinator tables are copy-on-write, we update a copy and then publish it
+        coordinators = dict(self._coordinators_for_services)
 
         if len(service_configs) > 0:
             lscape = self.landscape
 
+            # The first pass matches the configs to their couplings and creates all the coordinators
+            # that are needed before any services are created.
+            coordinated_configs = []
+
             for svc_config_info in service_configs:
                 svc_type = svc_config_info["serviceType"]
-                svc_integ_key = f"infrastructure:services:serviceType:{svc_type}"
 
-                if svc_integ_key in requested_coupling_table:
-                    coord_coupling: CoordinatorCoupling = requested_coupling_table[svc_integ_key]
+                coupling_entry = requested_coupling_index.get(("infrastructure", "services", "serviceType", svc_type))
 
-                    # If we don't have a device coordinator for this type of device yet,
+                if coupling_entry is not None:
+                    svc_integ_key, coord_coupling = coupling_entry
+
+                    # If we don't have a service coordinator for this type of service yet,
                     # create one.
-                    coordinator = None
-                    if svc_integ_key in self._coordinators_for_services:
-                        coordinator = self._coordinators_for_services[svc_integ_key]
-                    else:
+                    coordinator = coordinators.get(svc_integ_key)
+                    if coordinator is None:
                         coordinator = coord_coupling.create_coordinator(lscape)
-                        self._coordinators_for_services[svc_integ_key] = coordinator
-
-                    friendly_id, lssvc = coordinator.create_landscape_service(lscape, svc_config_info)
+                        coordinators[svc_integ_key] = coordinator
 
-                    services[friendly_id.identity] = lssvc
+                    coordinated_configs.append((coordinator, svc_config_info))
                 else:
                     unrecognized_service_configs.append(svc_config_info)
 
+            for coordinator, svc_config_info in coordinated_configs:
+                friendly_id, lssvc = coordinator.create_landscape_service(lscape, svc_config_info)
+
+                services[friendly_id.identity] = lssvc
+
+        self._coordinators_for_services = coordinators
+
         return services
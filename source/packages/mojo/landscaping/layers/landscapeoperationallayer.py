@@ -4,9 +4,14 @@ __copyright__ = "Copyright 2023, Myron W Walker"
 __credits__ = []
 
 
-from typing import Any, Dict, List, Optional, Union, TYPE_CHECKING
+from typing import Any, Dict, List, Mapping, Optional, Union, TYPE_CHECKING
 
 import os
+import sys
+
+from types import MappingProxyType
+
+from concurrent.futures import ThreadPoolExecutor
 
 from mojo.errors.xtraceback import format_exception
 from mojo.errors.exceptions import CheckinError, CheckoutError, SemanticError
@@ -14,11 +19,14 @@ from mojo.errors.exceptions import CheckinError, CheckoutError, SemanticError
 from mojo.interfaces.iexcludefilter import IExcludeFilter
 from mojo.interfaces.iincludefilter import IIncludeFilter
 
+from mojo.landscaping.filtering import compile_filter_selector
 from mojo.landscaping.layers.landscapinglayerbase import LandscapingLayerBase
 from mojo.landscaping.layers.landscapeintegrationlayer import LandscapeIntegrationLayer
 from mojo.landscaping.landscapedevice import LandscapeDevice
 from mojo.landscaping.landscapedevicecluster import LandscapeDeviceCluster
 from mojo.landscaping.cluster.nodecoordinatorbase import NodeCoordinatorBase
+from mojo.landscaping.coordinators.coordinatorbase import CoordinatorBase
+from mojo.landscaping.stripedpool import StripedPool
 
 from mojo.landscaping.landscapeparameters import (
     LandscapeActivationParams,
@@ -28,51 +36,44 @@ from mojo.landscaping.landscapeparameters import (
 if TYPE_CHECKING:
     from mojo.landscaping.landscape import Landscape
 
+# The maximum number of coordinators that are activated or connected concurrently
+COORDINATOR_MAX_WORKERS = 32
+
 
 class LandscapeOperationalLayer(LandscapingLayerBase):
 
     def __init__(self, lscape: "Landscape"):
         super().__init__(lscape)
 
+        # The operational clusters table is copy-on-write, it is replaced rather than modified
+        # when clusters are created, so it can be read without taking the landscape lock
         self._operational_clusters: Dict[str, LandscapeDeviceCluster] = {}
 
-        self._operational_clusters_pool: Dict[str, LandscapeDeviceCluster] = {}
-        self._operational_clusters_outstanding: Dict[str, LandscapeDeviceCluster] = {}
-
-        self._operational_device_pool: Dict[str, LandscapeDevice] = {}
-        self._operational_device_outstanding: Dict[str, LandscapeDevice] = {}
+        # The checkout state of the clusters and devices is kept in striped pools, so checkouts
+        # and checkins of different clusters and devices don't contend on a single lock.  When
+        # a cluster and its devices are moved together, the cluster pool stripes are always
+        # locked before the device pool stripes.
+        self._operational_clusters_pool = StripedPool()
+        self._operational_device_pool = StripedPool()
 
         return
 
     @property
     def available_clusters(self) -> Dict[str, LandscapeDeviceCluster]:
-        cluster_table = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            cluster_table = self._operational_clusters_pool.copy()
-        
+        cluster_table = self._operational_clusters_pool.available()
         return cluster_table
 
     @property
     def available_devices(self) -> Dict[str, LandscapeDevice]:
-        device_table = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            device_table = self._operational_device_pool.copy()
-        
+        device_table = self._operational_device_pool.available()
         return device_table
 
     @property
-    def operational_clusters(self) -> Dict[str, LandscapeDeviceCluster]:
-        cluster_table = {}
-
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            cluster_table = self._operational_clusters.copy()
-        
-        return cluster_table
+    def operational_clusters(self) -> Mapping[str, LandscapeDeviceCluster]:
+        """
+            Provides a read-only view of the operational clusters table.
+        """
+        return MappingProxyType(self._operational_clusters)
 
     def activate_coordinators(self, activation_params: LandscapeActivationParams):
         """
@@ -83,17 +84,16 @@ class LandscapeOperationalLayer(LandscapingLayerBase):
 
         layer_integ = lscape.layer_integration
 
-        coordinators_for_power = layer_integ.coordinators_for_power
-        for coord in coordinators_for_power.values():
-            coord.activate(activation_params)
+        # The power and serial coordinators are activated before the device coordinators.  The
+        # coordinators in each stage are independent of each other and activation is dominated by
+        # waiting on the network, so the coordinators in a stage are activated concurrently.
+        activation_stages = (
+            [*layer_integ.coordinators_for_power.values(), *layer_integ.coordinators_for_serial.values()],
+            list(layer_integ.coordinators_for_devices.values())
+        )
 
-        coordinators_for_serial = layer_integ.coordinators_for_serial
-        for coord in coordinators_for_serial.values():
-            coord.activate(activation_params)
-
-        coordinators_for_devices = layer_integ.coordinators_for_devices
-        for coord in coordinators_for_devices.values():
-            coord.activate(activation_params)
+        for stage_coordinators in activation_stages:
+            self._call_on_coordinators(stage_coordinators, "activate", activation_params)
 
         return
     
@@ -102,38 +102,30 @@ class LandscapeOperationalLayer(LandscapingLayerBase):
             Checkin clusters and associated devices to the operational pool.
         """
 
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            cname = cluster.name
+        cname = cluster.name
+        node_identities = [node.identity for node in cluster.nodes.values()]
 
-            if cname not in self._operational_clusters_outstanding:
-                err_msg_lines = [
-                    f"Checkin of cluster '{cname}' that was not previously checked out."
-                    "AVAILABLE POOL:"
-                ]
+        clusters_pool = self._operational_clusters_pool
+        device_pool = self._operational_device_pool
 
-                cluster_name_list = [ncname for ncname in self._operational_clusters_pool.keys()]
-                cluster_name_list.sort()
-                for ncname in cluster_name_list:
-                    err_msg_lines.append(f"    {ncname}")
+        checked_in = False
+        not_checked_in = []
 
-                err_msg_lines.append("OUTSTANDING POOL:")
-                cluster_name_list = [ncname for ncname in self._operational_clusters_outstanding.keys()]
-                cluster_name_list.sort()
-                for ncname in cluster_name_list:
-                    err_msg_lines.append(f"    {ncname}")
+        with clusters_pool.begin_locked_scope((cname,)):
+            if clusters_pool.locked_checkin(cname):
+                with device_pool.begin_locked_scope(node_identities):
+                    not_checked_in = device_pool.locked_checkin_many(node_identities)
+                checked_in = True
+
+        # The errors are formatted after the pool stripes are released because formatting
+        # snapshots the whole pool
+        if not checked_in:
+            raise CheckinError(self._format_checkin_error("cluster", cname, clusters_pool))
+
+        if len(not_checked_in) > 0:
+            node_list = ", ".join(not_checked_in)
+            raise CheckinError(self._format_checkin_error(f"cluster '{cname}' node(s)", node_list, device_pool))
 
-                err_msg = os.linesep.join(err_msg_lines)
-                raise CheckinError(err_msg)
-        
-            for node in cluster.nodes.values():
-                did = node.identity
-                del self._operational_device_outstanding[did]
-                self._operational_device_pool[did] = node
-
-            del self._operational_clusters_outstanding[cname]
-            self._operational_clusters_pool[cname] = cluster
-            
         return
 
     def checkin_device(self, device: LandscapeDevice):
@@ -141,32 +133,12 @@ class LandscapeOperationalLayer(LandscapingLayerBase):
             Checkin devices to the operational pool.
         """
         
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            dev_identity = device.identity
-
-            if dev_identity not in self._operational_device_outstanding:
-                err_msg_lines = [
-                    f"Checkin of device '{dev_identity}' that was not previously checked out."
-                    "AVAILABLE POOL:"
-                ]
-
-                device_identity_list = [did for did in self._operational_device_pool.keys()]
-                device_identity_list.sort()
-                for did in device_identity_list:
-                    err_msg_lines.append(f"    {did}")
+        dev_identity = device.identity
 
-                err_msg_lines.append("OUTSTANDING POOL:")
-                device_identity_list = [did for did in self._operational_device_outstanding.keys()]
-                device_identity_list.sort()
-                for did in device_identity_list:
-                    err_msg_lines.append(f"    {did}")
+        device_pool = self._operational_device_pool
 
-                err_msg = os.linesep.join(err_msg_lines)
-                raise CheckinError(err_msg)
-            
-            del self._operational_device_outstanding[dev_identity]
-            self._operational_device_outstanding[dev_identity] = device
+        if not device_pool.checkin(dev_identity):
+            raise CheckinError(self._format_checkin_error("device", dev_identity, device_pool))
 
         return
 
@@ -175,57 +147,70 @@ class LandscapeOperationalLayer(LandscapingLayerBase):
             Checkout clusters and associated devices from the operational pool.
         """
 
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
-            cname = cluster.name
-            if cname not in self._operational_clusters:
-                err_msg_lines = [
-                    f"The cluster named '{cname}' does not exist.",
-                    "EXISTING:"
-                ]
+        cname = cluster.name
+        if cname not in self._operational_clusters:
+            err_msg_lines = [
+                f"The cluster named '{cname}' does not exist.",
+                "EXISTING:"
+            ]
 
-                for exnames in self._operational_clusters:
-                    err_msg_lines.append(f"    {exnames}")
+            for exnames in self._operational_clusters:
+                err_msg_lines.append(f"    {exnames}")
 
-                err_msg = os.lines.join(err_msg_lines)
-                raise CheckoutError(err_msg)
-            
-            if cname not in self._operational_clusters_pool:
-                if cname not in self._operational_clusters_outstanding:
-                    err_msg = f"The specified cluster '{cname}' was not found in the pool or outstanding clusters."
-                    raise CheckoutError(err_msg)
-
-                # Trying to checkout a cluster that has already been checked out
-                err_msg = f"The specified cluster '{cname}' has already been checked out of the pool."
-                raise CheckoutError(err_msg)
+            err_msg = os.linesep.join(err_msg_lines)
+            raise CheckoutError(err_msg)
 
-            # When we checkout a cluster, we have to make sure all of its devices
-            # are available for checkout
-            unavailable_nodes = []
-            for node in cluster.nodes.values():
-                node_identity = node.identity
-                if node_identity not in self._operational_device_pool:
-                    unavailable_nodes.append(node)
-
-            if len(unavailable_nodes) > 0:
-                err_msg_lines = [
-                    f"Not all of the nodes are available for cluster '{cname}'.",
-                    "UNAVAILABLE NODES:"
-                ]
-                for node in unavailable_nodes:
-                    err_msg_lines.append(f"    {node.name}")
-                err_msg = os.linesep.join(err_msg_lines)
-                raise CheckoutError(err_msg)
+        cluster_nodes = list(cluster.nodes.values())
+        node_identities = [node.identity for node in cluster_nodes]
 
-            # The cluster is available and all the devices are available, complete the checkout
-            for node in cluster.nodes.values():
-                node_identity = node.identity
+        clusters_pool = self._operational_clusters_pool
+        device_pool = self._operational_device_pool
 
-                del self._operational_device_pool[node_identity]
-                self._operational_device_outstanding[node_identity] = node
+        # Only the state needed to report a failure is captured while the pool stripes are
+        # locked, the error messages are built after the locks have been released.
+        cluster_available = False
+        cluster_outstanding = False
+        unavailable_nodes = []
 
-            del self._operational_clusters_pool[cname]
-            self._operational_clusters_outstanding[cname] = cluster
+        with clusters_pool.begin_locked_scope((cname,)):
+
+            cluster_available = clusters_pool.locked_is_available(cname)
+            if cluster_available:
+
+                with device_pool.begin_locked_scope(node_identities):
+
+                    # When we checkout a cluster, we have to make sure all of its devices
+                    # are available for checkout
+                    for node in cluster_nodes:
+                        if not device_pool.locked_is_available(node.identity):
+                            unavailable_nodes.append(node)
+
+                    if len(unavailable_nodes) == 0:
+                        # The cluster is available and all the devices are available, complete the checkout
+                        device_pool.locked_checkout_many(node_identities)
+
+                        clusters_pool.locked_checkout(cname)
+            else:
+                cluster_outstanding = clusters_pool.locked_is_outstanding(cname)
+
+        if not cluster_available:
+            if not cluster_outstanding:
+                err_msg = f"The specified cluster '{cname}' was not found in the pool or outstanding clusters."
+                raise CheckoutError(err_msg)
+
+            # Trying to checkout a cluster that has already been checked out
+            err_msg = f"The specified cluster '{cname}' has already been checked out of the pool."
+            raise CheckoutError(err_msg)
+
+        if len(unavailable_nodes) > 0:
+            err_msg_lines = [
+                f"Not all of the nodes are available for cluster '{cname}'.",
+                "UNAVAILABLE NODES:"
+            ]
+            for node in unavailable_nodes:
+                err_msg_lines.append(f"    {node.name}")
+            err_msg = os.linesep.join(err_msg_lines)
+            raise CheckoutError(err_msg)
 
         return
 
@@ -234,17 +219,11 @@ class LandscapeOperationalLayer(LandscapingLayerBase):
             Checkout devices from the operational pool.
         """
         
-        lscape = self.landscape
-        with lscape.begin_locked_landscape_scope() as locked:
+        device_identity = device.identity
 
-            device_identity = device.identity
-
-            if device_identity not in self._operational_device_pool:
-                err_msg = f"The specified device '{device_identity}' is not available for checkout."
-                raise CheckoutError(err_msg)
-
-            del self._operational_device_pool[device_identity]
-            self._operational_device_outstanding[device_identity] = device
+        if not self._operational_device_pool.checkout(device_identity):
+            err_msg = f"The specified device '{device_identity}' is not available for checkout."
+            raise CheckoutError(err_msg)
 
         return
 
@@ -254,57 +233,24 @@ class LandscapeOperationalLayer(LandscapingLayerBase):
 
         layer_integ = lscape.layer_integration
 
-        coordinators_for_devices = layer_integ.coordinators_for_devices
-        for coord in coordinators_for_devices.values():
-            coord.establish_connectivity(activation_params)
+        coordinators_for_devices = list(layer_integ.coordinators_for_devices.values())
+        self._call_on_coordinators(coordinators_for_devices, "establish_connectivity", activation_params)
 
         return
     
     def get_cluster_by_name(self, cluster_name: str) -> Union[LandscapeDeviceCluster, None]:
 
-        cluster = None
-
-        lscape = self.landscape
-
-        with lscape.begin_locked_landscape_scope() as locked:
-            if cluster_name in self._operational_clusters:
-                cluster = self._operational_clusters[cluster_name]
-        
+        cluster = self._operational_clusters.get(cluster_name)
         return cluster
 
     def get_clusters(self, include_filters: Optional[List[IIncludeFilter]]=None, exclude_filters: Optional[List[IExcludeFilter]]=None) -> List[LandscapeDeviceCluster]:
         """
             Gets a copy of the operational clusters list.
         """
-        lscape = self.landscape
-
-        candidate_clusters = None
-
-        with lscape.begin_locked_landscape_scope() as locked:
-            candidate_clusters = [dev for dev in self._operational_clusters.values()]
-        
-        selected_clusters = []
+        candidate_clusters = list(self._operational_clusters.values())
 
-        if include_filters is None:
-            selected_clusters = candidate_clusters
-        else:
-            while len(candidate_clusters):
-                dev = candidate_clusters.pop()
-                for ifilter in include_filters:
-                    if ifilter.should_include(dev):
-                        selected_clusters.append(dev)
-                        break
-
-        if exclude_filters is not None:
-            candidate_clusters = selected_clusters
-
-            selected_clusters = []
-
-            while len(candidate_clusters):
-                dev = candidate_clusters.pop()
-                for xfilter in exclude_filters:
-                    if not xfilter.should_exclude(dev):
-                        selected_clusters.append(dev)
+        selector = compile_filter_selector(include_filters, exclude_filters)
+        selected_clusters = [cluster for cluster in candidate_clusters if selector(cluster)]
 
         return selected_clusters
 
@@ -318,8 +264,8 @@ class LandscapeOperationalLayer(LandscapingLayerBase):
         if topology_info is not None:
             self._create_clusters(integ_layer, topology_info)
 
-        self._operational_device_pool = integ_layer.integrated_devices
-        self._operational_clusters_pool = self._operational_clusters.copy()
+        self._operational_device_pool.reset(integ_layer.integrated_devices)
+        self._operational_clusters_pool.reset(self._operational_clusters)
 
         return
 
@@ -337,10 +283,55 @@ class LandscapeOperationalLayer(LandscapingLayerBase):
 
         return
 
+    def _call_on_coordinators(self, coordinators: List[CoordinatorBase], method_name: str,
+                              activation_params: LandscapeActivationParams):
+        """
+            Calls the specified method on each of the coordinators concurrently and waits for all the
+            calls to complete.  Every failure is logged, and once all the calls have completed the
+            failure of the first coordinator in the `coordinators` list that failed is raised.
+
+            ..note: The coordinators in a single call run on separate threads at the same time, so
+                    their `activate` and `establish_connectivity` implementations must be safe to run
+                    concurrently with the other coordinators. See :class:`CoordinatorBase`.
+        """
+
+        if len(coordinators) == 1:
+            getattr(coordinators[0], method_name)(activation_params)
+
+        elif len(coordinators) > 1:
+            max_workers = min(COORDINATOR_MAX_WORKERS, len(coordinators))
+
+            failures = []
+
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="coordinator") as executor:
+                futures = [
+                    (coord, executor.submit(getattr(coord, method_name), activation_params)) for coord in coordinators
+                ]
+
+                # The results are collected in submission order so the failure that is raised does
+                # not depend on the order the calls happened to complete in
+                for coord, fut in futures:
+                    xcpt = fut.exception()
+                    if xcpt is not None:
+                        failures.append((coord, xcpt))
+
+            if len(failures) > 0:
+                for coord, xcpt in failures:
+                    coord_type = type(coord).__name__
+                    self.logger.error(f"Coordinator '{coord_type}' failed in '{method_name}'.",
+                                      exc_info=(type(xcpt), xcpt, xcpt.__traceback__))
+
+                _, first_xcpt = failures[0]
+                raise first_xcpt
+
+        return
+
     def _create_clusters(self, integ_layer: LandscapeIntegrationLayer, topology_info: Dict[str, Any]):
 
         table_of_device_groups = integ_layer.integrated_device_groups
 
+        operational_clusters = dict(self._operational_clusters)
+
         # ================= EXAMPLE ===================
         #
         #   - name: primary
@@ -352,23 +343,17 @@ class LandscapeOperationalLayer(LandscapingLayerBase):
         #     spares:
         #         - mwalker-smbtest-yellow
 
-        if "clusters" in topology_info:
-            clusters = topology_info["clusters"]
+        clusters = topology_info.get("clusters")
+        if clusters is not None:
             for cinfo in clusters:
-                cname = cinfo["name"]
+                cname = sys.intern(cinfo["name"])
                 group_name = cinfo["group"]
 
-                nodes = []
-                if "nodes" in cinfo:
-                    nodes = cinfo["nodes"]
-                
-                spares = []
-                if "spares" in cinfo:
-                    spares = cinfo["spares"]
-
-                if group_name in table_of_device_groups:
-                    cgroup = table_of_device_groups[group_name]
+                nodes = cinfo.get("nodes", [])
+                spares = cinfo.get("spares", [])
 
+                cgroup = table_of_device_groups.get(group_name)
+                if cgroup is not None:
                     coordinator: NodeCoordinatorBase = cgroup.coordinator
                     cluster = coordinator.create_cluster_for_devices(cname, cgroup, nodes, spares)
 
@@ -385,6 +370,32 @@ class LandscapeOperationalLayer(LandscapingLayerBase):
                         errmsg = os.linesep.join(errmsg_lines)
                         raise RuntimeError(errmsg)
 
-                    self._operational_clusters[cname] = cluster
-        
+                    operational_clusters[cname] = cluster
+
+        self._operational_clusters = operational_clusters
+
         return
+
+    def _format_checkin_error(self, obj_kind: str, obj_key: str, pool: StripedPool) -> str:
+        """
+            Formats the error message for the checkin of an object that was not checked out.  This is
+            only called once a checkin has failed, so the successful checkin path never has to snapshot
+            and sort the pool.
+        """
+        available, outstanding = pool.snapshot()
+
+        err_msg_lines = [
+            f"Checkin of {obj_kind} '{obj_key}' that was not previously checked out.",
+            "AVAILABLE POOL:"
+        ]
+
+        for akey in sorted(available):
+            err_msg_lines.append(f"    {akey}")
+
+        err_msg_lines.append("OUTSTANDING POOL:")
+        for okey in sorted(outstanding):
+            err_msg_lines.append(f"    {okey}")
+
+        err_msg = os.linesep.join(err_msg_lines)
+
+        return err_msg
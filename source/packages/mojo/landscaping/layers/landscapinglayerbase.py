@@ -16,7 +16,6 @@ __credits__ = []
 from typing import TYPE_CHECKING
 
 import logging
-import weakref
 
 if TYPE_CHECKING:
     from mojo.landscaping.landscape import Landscape
@@ -27,10 +26,11 @@ class LandscapingLayerBase:
     logger = logging.getLogger()
 
     def __init__(self, lscape: "Landscape"):
-        self._lscape_ref = weakref.ref(lscape)
+        # The layers are owned by the :class:`Landscape` singleton, which lives for the life of the
+        # process, so a layer can hold a strong reference to it without keeping it alive any longer.
+        self._lscape = lscape
         return
     
     @property
-    def landscape(self):
-        lscape = self._lscape_ref()
-        return lscape
+    def landscape(self) -> "Landscape":
+        return self._lscape
@@ -18,6 +18,9 @@ from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 
 import os
 import pprint
+import textwrap
+
+from concurrent.futures import ThreadPoolExecutor
 
 from mojo.errors.exceptions import ConfigurationError, NotOverloadedError
 
@@ -34,22 +37,18 @@ from mojo.landscaping.service.servicebase import ServiceBase
 if TYPE_CHECKING:
     from mojo.landscaping.landscape import Landscape
 
+# The maximum number of service agents that are probed concurrently
+PROBE_MAX_WORKERS = 32
+
 
 def format_service_configuration_error(message, next_svc_config):
     """
         Takes an error message and an service configuration info dictionary and
         formats a configuration error message.
     """
-    error_lines = [
-        message,
-        "DEVICE:"
-    ]
-
-    svc_repr_lines = pprint.pformat(next_svc_config, indent=4).splitlines(False)
-    for dline in svc_repr_lines:
-        error_lines.append("    " + dline)
-    
-    errmsg = os.linesep.join(error_lines)
+    svc_repr = textwrap.indent(pprint.pformat(next_svc_config, indent=4), "    ")
+
+    errmsg = f"{message}{os.linesep}DEVICE:{os.linesep}{svc_repr}"
     return errmsg
 
 class ServiceCoordinatorBase(CoordinatorBase):
@@ -68,6 +67,8 @@ class ServiceCoordinatorBase(CoordinatorBase):
     def __init__(self, lscape: "Landscape", *args, **kwargs):
         super().__init__(lscape, *args, **kwargs)
 
+        # The children and ip to host tables are modified in place by derived coordinators while
+        # holding the coordinator lock, so they must only be read with the lock held.
         self._cl_upnp_hint_to_ip_lookup: Dict[str, str] = {}
         self._cl_ip_to_host_lookup: Dict[str, str] = {}
         return
@@ -90,29 +91,16 @@ class ServiceCoordinatorBase(CoordinatorBase):
 
         credentials = service.credentials
 
-        ssh_cred = None
-        for cred in credentials.values():
-            if "ssh" in cred.categories:
-                ssh_cred = cred
-                break
+        ssh_cred = next((cred for cred in credentials.values() if "ssh" in cred.categories), None)
 
         ssh_add_error = None
         
         if ssh_cred is not None:
-            if "host" in service_info:
-                host = service_info["host"]
-
-                users = None
-                if "users" in service_info:
-                    users = service_info["users"]
-
-                port = 22
-                if "port" in service_info:
-                    port = service_info["port"]
-
-                pty_params = None
-                if "pty_params" in service_info:
-                    pty_params = service_info["pty_params"]
+            host = service_info.get("host")
+            if host is not None:
+                users = service_info.get("users")
+                port = service_info.get("port", 22)
+                pty_params = service_info.get("pty_params")
 
                 self.create_ssh_agent(service, service_info, host, ssh_cred, 
                                       users=users, port=port, pty_params=pty_params)
@@ -156,18 +144,9 @@ class ServiceCoordinatorBase(CoordinatorBase):
             Called by the :class:`LandscapeOperationalLayer` in order for the coordinator to be able to
             verify connectivity with services.
         """
-        results = []
-
         cmd: str = "echo 'It Works'"
 
-        for agent in self.children_as_extension:
-            host = agent.host
-            ipaddr = agent.ipaddr
-            try:
-                status, stdout, stderr = agent.run_cmd(cmd)
-                results.append((host, ipaddr, status, stdout, stderr, None))
-            except Exception as xcpt: # pylint: disable=broad-except
-                results.append((host, ipaddr, None, None, None, xcpt))
+        results = self._probe_agents(cmd)
 
         return results
 
@@ -182,12 +161,10 @@ class ServiceCoordinatorBase(CoordinatorBase):
         """
         service = None
 
-        self._coord_lock.acquire()
-        try:
-            if host in self._cl_children:
-                service = self._cl_children[host].extended
-        finally:
-            self._coord_lock.release()
+        with self._coord_lock:
+            child = self._cl_children.get(host)
+            if child is not None:
+                service = child.extended
 
         return service
 
@@ -202,15 +179,12 @@ class ServiceCoordinatorBase(CoordinatorBase):
         """
         service = None
 
-        self._coord_lock.acquire()
-        try:
-            if ip in self._cl_ip_to_host_lookup:
-                if ip in self._cl_ip_to_host_lookup:
-                    host = self._cl_ip_to_host_lookup[ip]
-                    if host in self._cl_children:
-                        service = self._cl_children[host].extended
-        finally:
-            self._coord_lock.release()
+        with self._coord_lock:
+            host = self._cl_ip_to_host_lookup.get(ip)
+            if host is not None:
+                child = self._cl_children.get(host)
+                if child is not None:
+                    service = child.extended
 
         return service
 
@@ -228,17 +202,40 @@ class ServiceCoordinatorBase(CoordinatorBase):
 
             :returns: A list of errors encountered when verifying connectivity with the services managed or watched by the coordinator.
         """
+        results = self._probe_agents(cmd)
+
+        if raiseerror:
+            for _, _, _, _, _, xcpt in results:
+                if xcpt is not None:
+                    raise xcpt
+
+        return results
+
+    def _probe_agent(self, agent, cmd: str) -> tuple:
+        host = agent.host
+        ipaddr = agent.ipaddr
+        try:
+            status, stdout, stderr = agent.run_cmd(cmd)
+            result = (host, ipaddr, status, stdout, stderr, None)
+        except Exception as xcpt: # pylint: disable=broad-except
+            result = (host, ipaddr, None, None, None, xcpt)
+
+        return result
+
+    def _probe_agents(self, cmd: str) -> List[tuple]:
+        """
+            Runs the command on all of the agents concurrently, the probes are network round trips so running
+            them concurrently overlaps the waiting.  The results are returned in agent order.
+        """
         results = []
 
-        for agent in self.children_as_extension:
-            host = agent.host
-            ipaddr = agent.ipaddr
-            try:
-                status, stdout, stderr = agent.run_cmd(cmd)
-                results.append((host, ipaddr, status, stdout, stderr, None))
-            except Exception as xcpt: # pylint: disable=broad-except
-                if raiseerror:
-                    raise
-                results.append((host, ipaddr, None, None, None, xcpt))
+        agents = list(self.children_as_extension)
+
+        if len(agents) > 0:
+            max_workers = min(PROBE_MAX_WORKERS, len(agents))
+
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="service-probe") as executor:
+                futures = [executor.submit(self._probe_agent, agent, cmd) for agent in agents]
+                results = [fut.result() for fut in futures]
 
         return results
@@ -15,10 +15,6 @@ __credits__ = []
 
 from typing import Any, Dict, List, Tuple, TYPE_CHECKING
 
-from functools import partial
-
-from mojo.errors.exceptions import SemanticError
-
 from mojo.landscaping.coupling.coordinatorcoupling import CoordinatorCoupling
 from mojo.landscaping.service.servicecoordinatorbase import ServiceCoordinatorBase
 
@@ -31,12 +27,7 @@ if TYPE_CHECKING:
 SUPPORTED_INTEGRATION_CLASS = "network/service-base"
 
 def is_matching_service_config(integ_class, service_info):
-    is_matching_service = False
-
-    svc_type = service_info["serviceType"]
-    if svc_type == integ_class:
-        is_matching_service = True
-
+    is_matching_service = service_info["serviceType"] == integ_class
     return is_matching_service
 
 class ServiceCoordinatorCouplingBase(CoordinatorCoupling):
@@ -51,13 +42,6 @@ class ServiceCoordinatorCouplingBase(CoordinatorCoupling):
 
     COORDINATOR_TYPE = ServiceCoordinatorBase
 
-    def __init__(self, *args, **kwargs):
-        """
-            The default contructor for an :class:`BaseServiceCoordinatorIntegration`.
-        """
-        super().__init__(*args, **kwargs)
-        return
-
     @classmethod
     def attach_to_environment(cls, landscape: "Landscape"):
         """
@@ -70,13 +54,10 @@ class ServiceCoordinatorCouplingBase(CoordinatorCoupling):
         cls.landscape = landscape
         layer_config = landscape.layer_configuration
 
-        service_list = layer_config.get_service_configs()
-        if len(service_list) > 0:
-            svc_service_list = [svc for svc in filter(partial(is_matching_service_config, cls.integration_class), service_list)]
-
-            if len(svc_service_list) > 0:
-                layer_integ = landscape.layer_integration
-                layer_integ.register_integration_dependency(cls)
+        svc_service_list = layer_config.get_service_configs_by_type(cls.integration_class)
+        if svc_service_list:
+            layer_integ = landscape.layer_integration
+            layer_integ.register_integration_dependency(cls)
 
         return
 
@@ -138,22 +119,19 @@ class ServiceCoordinatorCouplingBase(CoordinatorCoupling):
         lscape = cls.landscape
         layer_integ = lscape.layer_integration
 
-        service_list = layer_integ.get_services()
-        if len(service_list) > 0:
-            svc_service_list = [svc for svc in filter(partial(is_matching_service_config, cls.integration_class), service_list)]
-
-            if len(svc_service_list) == 0:
-                raise SemanticError("We should have not been called if no services are available.")
+        svc_service_list = layer_integ.get_services_by_type(cls.integration_class)
+        if not svc_service_list:
+            return ([], {})
 
-            svc_config_errors, matching_service_results, missing_service_results = cls.coordinator.attach_to_services(
-                svc_service_list)
+        svc_config_errors, matching_service_results, missing_service_results = cls.coordinator.attach_to_services(
+            svc_service_list)
 
-            svc_scan_results = {
-                "default": {
-                    "matching_services": matching_service_results,
-                    "missing_services": missing_service_results
-                }
+        svc_scan_results = {
+            "default": {
+                "matching_services": matching_service_results,
+                "missing_services": missing_service_results
             }
+        }
 
         return (svc_config_errors, svc_scan_results)
 
@@ -0,0 +1,274 @@
+"""
+.. module:: stripedpool
+    :platform: Darwin, Linux, Unix, Windows
+    :synopsis: Module containing the :class:`StripedPool` class which is used to track the checkout
+               and checkin of pooled objects using locks that are striped across the object keys.
+
+.. moduleauthor:: Myron Walker <myron.walker@gmail.com>
+
+"""
+
+__author__ = "Myron Walker"
+__copyright__ = "Copyright 2023, Myron W Walker"
+__credits__ = []
+
+
+
+from typing import Any, ContextManager, Dict, Hashable, Iterable, Iterator, List, Mapping, Tuple
+
+import contextlib
+import threading
+
+
+DEFAULT_STRIPE_COUNT = 16
+
+
+class PoolStripe:
+    """
+        A :class:`PoolStripe` holds the available and outstanding objects for the keys that hash
+        to the stripe along with the lock that guards them.
+    """
+
+    __slots__ = ("lock", "available", "outstanding", "count")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.available: Dict[Hashable, Any] = {}
+        self.outstanding: Dict[Hashable, Any] = {}
+
+        # The number of objects that belong to the stripe, checkins and checkouts only move objects
+        # between the available and outstanding tables so this never changes between resets.
+        self.count = 0
+        return
+
+
+class StripedPool:
+    """
+        A :class:`StripedPool` tracks which of a set of keyed objects are available and which are
+        checked out.  The objects are spread across stripes by the hash of their keys and each stripe
+        has its own lock, so checkouts and checkins of objects in different stripes do not contend
+        with each other.
+
+        ..note: Operations that span multiple stripes always acquire the stripe locks in stripe order
+                so that they cannot deadlock with each other.
+    """
+
+    def __init__(self, stripe_count: int = DEFAULT_STRIPE_COUNT):
+        if stripe_count <= 0 or stripe_count & (stripe_count - 1) != 0:
+            errmsg = f"StripedPool: The stripe count must be a power of two, stripe_count={stripe_count}."
+            raise ValueError(errmsg)
+
+        self._stripe_mask = stripe_count - 1
+        self._stripes: Tuple[PoolStripe, ...] = tuple(PoolStripe() for _ in range(stripe_count))
+        return
+
+    def available(self) -> Dict[Hashable, Any]:
+        """
+            Returns a copy of the table of available objects.
+        """
+        available, _ = self.snapshot()
+        return available
+
+    def outstanding(self) -> Dict[Hashable, Any]:
+        """
+            Returns a copy of the table of objects that are checked out.
+        """
+        _, outstanding = self.snapshot()
+        return outstanding
+
+    def begin_locked_scope(self, keys: Iterable[Hashable]) -> ContextManager[None]:
+        """
+            Creates a scope that holds the locks of all the stripes the specified keys belong to.  The
+            `locked_*` methods can be called for any of the keys while the scope is held.
+
+            :param keys: The keys of the objects that are going to be operated on.
+        """
+        lkd_scope = self._begin_locked_stripes_scope(self._stripes_for_keys(keys))
+        return lkd_scope
+
+    def checkin(self, key: Hashable) -> bool:
+        """
+            Checks in the object with the specified key.
+
+            :param key: The key of the object to checkin.
+
+            :returns: A boolean indicating if the object was checked out and has been checked in.
+        """
+        stripe = self._stripe_for_key(key)
+
+        with stripe.lock:
+            checked_in = self._move(stripe, stripe.outstanding, stripe.available, key)
+
+        return checked_in
+
+    def checkout(self, key: Hashable) -> bool:
+        """
+            Checks out the object with the specified key.
+
+            :param key: The key of the object to checkout.
+
+            :returns: A boolean indicating if the object was available and has been checked out.
+        """
+        stripe = self._stripe_for_key(key)
+
+        with stripe.lock:
+            checked_out = self._move(stripe, stripe.available, stripe.outstanding, key)
+
+        return checked_out
+
+    def locked_checkin(self, key: Hashable) -> bool:
+        """
+            Checks in the object with the specified key.  The stripe for the key must be locked by the
+            caller using :meth:`begin_locked_scope`.
+        """
+        stripe = self._stripe_for_key(key)
+        checked_in = self._move(stripe, stripe.outstanding, stripe.available, key)
+        return checked_in
+
+    def locked_checkin_many(self, keys: Iterable[Hashable]) -> List[Hashable]:
+        """
+            Checks in the objects with the specified keys, moving the objects for each stripe in a single
+            batch.  The stripes for the keys must be locked by the caller using :meth:`begin_locked_scope`.
+
+            :returns: A list of the keys of the objects that were not checked out and were not checked in.
+        """
+        not_moved = self._move_many(keys, to_outstanding=False)
+        return not_moved
+
+    def locked_checkout(self, key: Hashable) -> bool:
+        """
+            Checks out the object with the specified key.  The stripe for the key must be locked by the
+            caller using :meth:`begin_locked_scope`.
+        """
+        stripe = self._stripe_for_key(key)
+        checked_out = self._move(stripe, stripe.available, stripe.outstanding, key)
+        return checked_out
+
+    def locked_checkout_many(self, keys: Iterable[Hashable]) -> List[Hashable]:
+        """
+            Checks out the objects with the specified keys, moving the objects for each stripe in a single
+            batch.  The stripes for the keys must be locked by the caller using :meth:`begin_locked_scope`.
+
+            :returns: A list of the keys of the objects that were not available and were not checked out.
+        """
+        not_moved = self._move_many(keys, to_outstanding=True)
+        return not_moved
+
+    def locked_is_available(self, key: Hashable) -> bool:
+        """
+            Returns a boolean indicating if the object with the specified key is available.  The stripe
+            for the key must be locked by the caller using :meth:`begin_locked_scope`.
+        """
+        is_available = key in self._stripe_for_key(key).available
+        return is_available
+
+    def locked_is_outstanding(self, key: Hashable) -> bool:
+        """
+            Returns a boolean indicating if the object with the specified key is checked out.  The stripe
+            for the key must be locked by the caller using :meth:`begin_locked_scope`.
+        """
+        is_outstanding = key in self._stripe_for_key(key).outstanding
+        return is_outstanding
+
+    def reset(self, items: Mapping[Hashable, Any]) -> None:
+        """
+            Resets the pool so it contains the specified objects, all of which are available.
+
+            :param items: A table of the objects to pool by key.
+        """
+        stripe_tables = [{} for _ in self._stripes]
+
+        stripe_mask = self._stripe_mask
+        for key, item in items.items():
+            stripe_tables[hash(key) & stripe_mask][key] = item
+
+        with self._begin_locked_stripes_scope(self._stripes):
+            for stripe, stripe_table in zip(self._stripes, stripe_tables):
+                stripe.available = stripe_table
+                stripe.outstanding = {}
+                stripe.count = len(stripe_table)
+
+        return
+
+    def snapshot(self) -> Tuple[Dict[Hashable, Any], Dict[Hashable, Any]]:
+        """
+            Returns consistent copies of the tables of available and outstanding objects.
+        """
+        available = {}
+        outstanding = {}
+
+        with self._begin_locked_stripes_scope(self._stripes):
+            for stripe in self._stripes:
+                available.update(stripe.available)
+                outstanding.update(stripe.outstanding)
+
+        return available, outstanding
+
+    @contextlib.contextmanager
+    def _begin_locked_stripes_scope(self, stripes: Iterable[PoolStripe]) -> Iterator[None]:
+        acquired = []
+        try:
+            for stripe in stripes:
+                stripe.lock.acquire()
+                acquired.append(stripe)
+
+            yield
+
+        finally:
+            for stripe in reversed(acquired):
+                stripe.lock.release()
+
+        return
+
+    def _move(self, stripe: PoolStripe, from_table: Dict[Hashable, Any], to_table: Dict[Hashable, Any],
+              key: Hashable) -> bool:
+        moved = False
+
+        if key in from_table:
+            to_table[key] = from_table.pop(key)
+            moved = True
+
+        # An object must always be in exactly one of the available or outstanding tables
+        assert len(stripe.available) + len(stripe.outstanding) == stripe.count, \
+            f"StripedPool: The stripe lost track of objects while moving key={key!r}."
+
+        return moved
+
+    def _move_many(self, keys: Iterable[Hashable], to_outstanding: bool) -> List[Hashable]:
+        not_moved = []
+
+        stripe_mask = self._stripe_mask
+
+        keys_by_stripe: Dict[int, List[Hashable]] = {}
+        for key in keys:
+            keys_by_stripe.setdefault(hash(key) & stripe_mask, []).append(key)
+
+        for sidx, stripe_keys in keys_by_stripe.items():
+            stripe = self._stripes[sidx]
+
+            if to_outstanding:
+                from_table, to_table = stripe.available, stripe.outstanding
+            else:
+                from_table, to_table = stripe.outstanding, stripe.available
+
+            moving = {key: from_table.pop(key) for key in stripe_keys if key in from_table}
+            to_table.update(moving)
+
+            if len(moving) < len(stripe_keys):
+                not_moved.extend(key for key in stripe_keys if key not in moving)
+
+            # An object must always be in exactly one of the available or outstanding tables
+            assert len(stripe.available) + len(stripe.outstanding) == stripe.count, \
+                f"StripedPool: The stripe lost track of objects while moving keys={stripe_keys!r}."
+
+        return not_moved
+
+    def _stripe_for_key(self, key: Hashable) -> PoolStripe:
+        stripe = self._stripes[hash(key) & self._stripe_mask]
+        return stripe
+
+    def _stripes_for_keys(self, keys: Iterable[Hashable]) -> List[PoolStripe]:
+        stripe_mask = self._stripe_mask
+        stripe_indexes = sorted({hash(key) & stripe_mask for key in keys})
+        stripes = [self._stripes[sidx] for sidx in stripe_indexes]
+        return stripes
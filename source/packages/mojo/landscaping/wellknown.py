@@ -11,6 +11,8 @@ from threading import RLock
 
 from mojo.extension.wellknown import ConfiguredSuperFactorySingleton
 
+from mojo.landscaping.landscapingextensionprotocol import LandscapingExtensionProtocol
+
 if TYPE_CHECKING:
     from mojo.landscaping.landscape import Landscape
 
@@ -33,21 +35,18 @@ def LandscapeSingleton() -> "Landscape":
     if LANDSCAPE_SINGLETON is None:
         super_factory = ConfiguredSuperFactorySingleton()
 
-        SINGLETON_LOCK.acquire()
-        try:
-            from mojo.landscaping.landscapingextensionprotocol import LandscapingExtensionProtocol
-
+        with SINGLETON_LOCK:
             if LANDSCAPE_SINGLETON is None:
                 LandscapeType = super_factory.get_override_types_by_order(
                     LandscapingExtensionProtocol.get_landscape_type)
 
                 if LandscapeType is None:
+                    # The landscape module imports this module, so it is imported here to
+                    # avoid a circular import.
                     from mojo.landscaping.landscape import Landscape
                     LandscapeType = Landscape
 
                 LANDSCAPE_SINGLETON = LandscapeType()
-        finally:
-            SINGLETON_LOCK.release()
 
     return LANDSCAPE_SINGLETON
 